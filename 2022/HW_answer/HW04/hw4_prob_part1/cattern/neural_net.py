@@ -18,7 +18,8 @@ class TwoLayerNet(object):
   The outputs of the second fully-connected layer are the scores for each class.
   """
 
-  def __init__(self, input_size, hidden_size, output_size, std=1e-4):
+  def __init__(self, input_size, hidden_size, output_size, std=1e-4,
+               dtype=np.float32):
     """
     Initialize the model. Weights are initialized to small random values and
     biases are initialized to zero. Weights and biases are stored in the
@@ -33,12 +34,37 @@ class TwoLayerNet(object):
     - input_size: The dimension D of the input data.
     - hidden_size: The number of neurons H in the hidden layer.
     - output_size: The number of classes C.
+    - dtype: Numpy datatype of the parameters. The float32 default halves
+      the memory traffic of every matmul relative to float64 and is ample
+      for SGD training; pass np.float64 when comparing against numerical
+      gradients, where float32 rounding dominates the finite differences.
+
+    All parameters live in one contiguous flat buffer; the entries of
+    self.params are reshaped views into it, so in-place updates on either
+    the views or the flat buffer stay in sync.
     """
-    self.params = {}
-    self.params['W1'] = std * np.random.randn(input_size, hidden_size)
-    self.params['b1'] = np.zeros(hidden_size)
-    self.params['W2'] = std * np.random.randn(hidden_size, output_size)
-    self.params['b2'] = np.zeros(output_size)
+    D, H, C = input_size, hidden_size, output_size
+    self._param_layout = {}
+    offset = 0
+    for name, shape in (('W1', (D, H)), ('b1', (H,)), ('W2', (H, C)), ('b2', (C,))):
+      size = int(np.prod(shape))
+      self._param_layout[name] = (slice(offset, offset + size), shape)
+      offset += size
+    self._flat_params = np.empty(offset, dtype=dtype)
+    self.params = self._param_views(self._flat_params)
+    self.params['W1'][...] = std * np.random.randn(D, H)
+    self.params['b1'][...] = 0
+    self.params['W2'][...] = std * np.random.randn(H, C)
+    self.params['b2'][...] = 0
+    # Cached row index for the fancy-indexing steps in loss; train calls
+    # loss with a fixed batch size, so this is built once, not per step.
+    self._rows = None
+
+  def _param_views(self, flat):
+    """Return a dict of named, reshaped views into a flat parameter-sized
+    buffer, laid out as in self._param_layout."""
+    return {name: flat[sl].reshape(shape)
+            for name, (sl, shape) in self._param_layout.items()}
 
   def loss(self, X, y=None, reg=0.0):
     """
@@ -66,6 +92,9 @@ class TwoLayerNet(object):
     # Unpack variables from the params dictionary
     W1, b1 = self.params['W1'], self.params['b1']
     W2, b2 = self.params['W2'], self.params['b2']
+    # Match the parameter dtype so a float64 X does not upcast the whole
+    # forward/backward pass (no copy when the dtypes already agree).
+    X = X.astype(W1.dtype, copy=False)
     N, D = X.shape
 
     # Compute the forward pass
@@ -77,8 +106,11 @@ class TwoLayerNet(object):
     # shape (N, C). Note that this does not include the softmax                 #
     # HINT: This is just a series of matrix multiplication.                     #
     #############################################################################
-    a1 = np.maximum(0, np.matmul(X, W1) + b1) # shape : (N,D)
-    scores = np.matmul(a1, W2) + b2
+    a1 = X @ W1 # shape : (N,H)
+    np.add(a1, b1, out=a1)    # bias-add and ReLU reuse the matmul buffer,
+    np.maximum(a1, 0, out=a1) # avoiding two extra (N,H) temporaries
+    scores = a1 @ W2
+    scores += b2
     #############################################################################
     #                              END OF TODO#1                                #
     #############################################################################
@@ -95,10 +127,23 @@ class TwoLayerNet(object):
     # in the variable loss, which should be a scalar. Use the Softmax           #
     # classifier loss.                                                          #
     #############################################################################
-    softmax = np.exp(scores)
-    softmax = np.array([row/row.sum() for row in softmax])
-    losses = -np.log(softmax[np.arange(N), y])
-    loss = np.sum(losses)/N + reg * (np.sum(W1**2) + np.sum(W2**2))/2
+    # Cross-entropy in log-sum-exp form: shift by the per-row max so exp
+    # never overflows, then loss_i = log(sum_j exp(s_ij)) - s_iy. The
+    # normalization into probabilities is deferred to the backward pass,
+    # where the exp buffer is reused as dscores.
+    # scores is not needed again on this path, so shift it in place.
+    if self._rows is None or self._rows.shape[0] != N:
+      self._rows = np.arange(N)
+    rows = self._rows
+    shifted = scores
+    shifted -= shifted.max(axis=1, keepdims=True)
+    expscores = np.exp(shifted)
+    sumexp = expscores.sum(axis=1, keepdims=True)
+    data_loss = (np.log(sumexp).sum() - shifted[rows, y].sum()) / N
+    # ||W||^2 as a dot product of the raveled weights: one fused
+    # multiply-accumulate pass, no squared temporary the size of W.
+    reg_loss = np.dot(W1.ravel(), W1.ravel()) + np.dot(W2.ravel(), W2.ravel())
+    loss = data_loss + reg * reg_loss/2
     #############################################################################
     #                              END OF TODO#2                                #
     #############################################################################
@@ -137,25 +182,38 @@ class TwoLayerNet(object):
     
     # dW1, dW2, db1, db2 have to divided by N.
     
-    dscores = softmax[:,:]
-    dscores[np.arange(N), y] -= 1
+    # The loss has already been computed, so the exp buffer can be
+    # normalized into probabilities and consumed in place. Dividing
+    # dscores by N once up front lets the /N fold into every downstream
+    # gradient for free.
+    dscores = expscores
+    dscores /= sumexp
+    dscores[rows, y] -= 1
+    dscores /= N
 
-    dW2 = np.matmul(a1.T, dscores)/N
-    
-    db2 = (np.matmul(np.ones((1,N)), dscores)/N).reshape(-1)
-    
-    da1 = np.matmul(dscores, W2.T)
-    da1[a1 <= 0] = 0
-    
-    dW1 = np.matmul(X.T, da1)/N
-    
-    tmp = np.ones((1,N))
-    db1 = (np.matmul(tmp, da1)/N).reshape(-1)
-    
-    dW1 += reg * W1     
-    dW2 += reg * W2
-    
-    grads = {'W1': dW1, 'b1': db1, 'W2': dW2, 'b2': db2}
+    # Gradients are written straight into a fresh flat buffer mirroring
+    # the parameter layout; train consumes it for a single fused update.
+    flat_grads = np.empty_like(self._flat_params)
+    grads = self._param_views(flat_grads)
+
+    np.matmul(a1.T, dscores, out=grads['W2'])
+
+    dscores.sum(axis=0, out=grads['b2'])
+
+    # Bool ReLU mask: one byte per element instead of an (N,H) float
+    # temporary, and the multiply leaves da1 in place.
+    a1_mask = a1 > 0
+    da1 = dscores @ W2.T
+    da1 *= a1_mask
+
+    np.matmul(X.T, da1, out=grads['W1'])
+
+    da1.sum(axis=0, out=grads['b1'])
+
+    grads['W1'] += reg * W1
+    grads['W2'] += reg * W2
+
+    self._flat_grads = flat_grads
     
     #############################################################################
     #                              END OF TODO#3                                #
@@ -201,7 +259,7 @@ class TwoLayerNet(object):
       # them in X_batch and y_batch respectively.                             #
       # You might find np.random.choice() helpful.                            #
       #########################################################################
-      idx = np.random.choice(num_train, batch_size)
+      idx = np.random.randint(num_train, size=batch_size)
       X_batch, y_batch = X[idx], y[idx]
       #########################################################################
       #                             END OF YOUR TODO#4                        #
@@ -217,10 +275,10 @@ class TwoLayerNet(object):
       # using stochastic gradient descent. You'll need to use the gradients   #
       # stored in the grads dictionary defined above.                         #
       #########################################################################
-      self.params['W1'] -= learning_rate*grads['W1']
-      self.params['W2'] -= learning_rate*grads['W2']
-      self.params['b1'] -= learning_rate*grads['b1']
-      self.params['b2'] -= learning_rate*grads['b2']
+      # grads is a dict of views into the flat gradient buffer laid out
+      # like the flat parameter buffer, so all four parameters update in
+      # one contiguous in-place axpy.
+      self._flat_params -= learning_rate * self._flat_grads
       #########################################################################
       #                             END OF YOUR TODO#5                        #
       #########################################################################
@@ -272,8 +330,12 @@ class TwoLayerNet(object):
     ###########################################################################
     # TODO#7: Implement this function; it should be VERY simple!              #
     ###########################################################################
-    a1 = np.maximum(0, (X.dot(self.params['W1']) + self.params['b1']))
-    scores = a1.dot(self.params['W2']) + self.params['b2']
+    X = X.astype(self.params['W1'].dtype, copy=False)
+    a1 = X.dot(self.params['W1'])
+    np.add(a1, self.params['b1'], out=a1)
+    np.maximum(a1, 0, out=a1)
+    scores = a1.dot(self.params['W2'])
+    scores += self.params['b2']
     y_pred = np.argmax(scores, axis=1)
     ###########################################################################
     #                              END OF YOUR TODO#7                         #